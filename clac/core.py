@@ -22,8 +22,13 @@
 from abc import ABCMeta, abstractmethod
 from collections.abc import Mapping
 import enum
+import functools
 import os
-from typing import Any, Callable, Set, Tuple, Optional, Iterator, Dict
+import sys
+from types import MappingProxyType
+from typing import (
+    Any, Callable, Set, FrozenSet, Tuple, Optional, Iterable, Iterator, Dict, List
+)
 from warnings import warn
 
 from .exceptions import NoConfigKey, MissingLayer, ImmutableLayer, LayerOverwriteError
@@ -61,6 +66,8 @@ class BaseConfigLayer(Mapping, metaclass=ABCMeta):
     :param mutable: ``bool`` representing whether the layer allows mutation.
         Readable using the :meth:`mutable` property.
     """
+    __slots__ = ('_layer_name', '_mutable', '__weakref__')
+
     def __init__(self, name: str, mutable: bool = False) -> None:
         self._layer_name: str = name
         self._mutable = mutable
@@ -78,6 +85,16 @@ class BaseConfigLayer(Mapping, metaclass=ABCMeta):
         except LookupError:
             return default
 
+    def __contains__(self, key: object) -> bool:
+        """True if ``key`` can be retrieved from the layer."""
+        # ! Mapping.__contains__ only catches KeyError, which lets NoConfigKey
+        # ! escape.
+        try:
+            self[key]
+        except LookupError:
+            return False
+        return True
+
     def setdefault(self, key: str, default: Any = None) -> Any:
         """If ``key`` is in the lookup, return its value.
 
@@ -130,8 +147,28 @@ class BaseConfigLayer(Mapping, metaclass=ABCMeta):
     def names(self):
         """Returns the full list of keys in the Layer"""
 
+    @property
+    def _indexable(self) -> bool:
+        """Whether a :class:`CLAC` may resolve keys through :attr:`names`.
+
+        Only true when :attr:`names` lists every key the layer can resolve,
+        and that set cannot change after the layer is added.  Layers which
+        are not indexable are always queried directly.
+        """
+        return False
+
+
+_MISSING = object()
 
-_GET = object()
+
+@functools.lru_cache(maxsize=1024)
+def _split_dotted_key(key: str) -> Tuple[Tuple[str, ...], str]:
+    """Splits ``key`` on ``.`` into its parent parts and its last part.
+
+    Results are cached, since the same keys tend to be read repeatedly.
+    """
+    *parents, last = key.split('.')
+    return tuple(parents), last
 
 
 class DictLayer(BaseConfigLayer):
@@ -143,7 +180,11 @@ class DictLayer(BaseConfigLayer):
 
     ``config_dict``
         An optional mapping object which contains the initial state of the
-        configuration layer.
+        configuration layer.  The layer caches data derived from this mapping,
+        so it should only be modified through the layer itself.  Immutable
+        layers using :attr:`DictStructure.Split` answer every read from a
+        flattened snapshot, taken on first use.  Nested dicts they return are
+        read-only copies.
 
     ``mutable``
         A boolean representing whether the layer should allow mutation.
@@ -178,6 +219,8 @@ class DictLayer(BaseConfigLayer):
            layer2 = DictLayer('name', flat, dot_strategy=DictStructure.Flat)
            assert layer2['a.b.c'] == 'd'
     """
+    __slots__ = ('_config_dict', '_dot_strategy', '_split', '_names_cache', '_flat_cache')
+
     def __init__(
             self,
             name: str,
@@ -197,7 +240,11 @@ class DictLayer(BaseConfigLayer):
             memb = f'{DictStructure.__module__}.{DictStructure.__name__}'
             msg = f'dot_strategy param must be a member of the {memb} enum.'
             raise ValueError(msg)
-        self.dot_strategy = dot_strategy
+        self._dot_strategy = dot_strategy
+        # Resolved once, since every read would otherwise compare enum members.
+        self._split = dot_strategy is DictStructure.Split
+        self._names_cache: Optional[FrozenSet[str]] = None
+        self._flat_cache: Optional[Dict[str, Any]] = None
 
     def __getitem__(self, key: str) -> Any:
         """Returns the value stored by ``key``
@@ -205,27 +252,73 @@ class DictLayer(BaseConfigLayer):
         This interface is strategy-aware, and will search the dict according
         to the strategy.
         """
-        if self.dot_strategy is DictStructure.Split:
-            return self.__dot_split_operation(key)
-        if self.dot_strategy is DictStructure.Flat:
+        if not self._split:
             try:
                 return self._config_dict[key]
             except KeyError:
                 raise NoConfigKey(key) from None
-        raise ValueError('dot_strategy is not a known type')  # pragma: no cover
+        if not self._mutable:
+            rv = self.__flat().get(key, _MISSING)
+            if rv is _MISSING:
+                raise NoConfigKey(key)
+            return rv
+        parent, last_key_part = self.__dot_split_parent(key)
+        return parent[last_key_part]
+
+    def get(self, key: str, default=None) -> Any:
+        """Gets the value for the specified ``key``
+
+        Returns ``default`` if ``key`` is not found.  Misses are detected
+        without raising internally, unless a subclass overrides
+        :meth:`__getitem__`.
+        """
+        if type(self).__getitem__ is not DictLayer.__getitem__:
+            return super().get(key, default)
+        if not self._split:
+            return self._config_dict.get(key, default)
+        if not self._mutable:
+            return self.__flat().get(key, default)
+        return self.__dot_split_get(key, default)
+
+    @property
+    def dot_strategy(self) -> DictStructure:
+        """The :class:`DictStructure` variant used by the layer.
+
+        The strategy is fixed when the layer is created.
+        """
+        return self._dot_strategy
 
     def __setitem__(self, key: str, value: Any) -> None:
         self.assert_mutable()
-        if self.dot_strategy is DictStructure.Split:
-            self.__dot_split_operation(key, value)
-            return None
-        if self.dot_strategy is DictStructure.Flat:
+        if self._split:
+            parent, last_key_part = self.__dot_split_parent(key)
+            parent[last_key_part] = value
+        else:
             self._config_dict[key] = value
-            return None
-        raise ValueError('dot_strategy is not a known type')  # pragma: no cover
+        self._invalidate()
 
-    def __dot_split_operation(self, key_str: str, value=_GET) -> Any:
-        *keylist, last_key_part = key_str.split('.')
+    @property
+    def _indexable(self) -> bool:
+        # Split layers resolve key prefixes which are not part of names, and
+        # other mapping types (like os.environ) may not compare keys exactly.
+        # Subclasses which change how keys are looked up are never indexed.
+        cls = type(self)
+        return (
+            not self.mutable
+            and not self._split
+            and type(self._config_dict) is dict  # pylint: disable=C0123
+            and cls.__getitem__ is DictLayer.__getitem__
+            and cls.names is DictLayer.names
+        )
+
+    def _invalidate(self) -> None:
+        """Drops cached data derived from the underlying dict."""
+        self._names_cache = None
+        self._flat_cache = None
+
+    def __dot_split_parent(self, key_str: str) -> Tuple[Any, str]:
+        """Returns the dict holding ``key_str``, and the key's last part."""
+        keylist, last_key_part = _split_dotted_key(key_str)
 
         current_val = self._config_dict
         for keypart in keylist:
@@ -233,12 +326,32 @@ class DictLayer(BaseConfigLayer):
                 current_val = current_val[keypart]
             except LookupError:
                 raise NoConfigKey(key_str) from None
+        return current_val, last_key_part
 
-        if value is _GET:
-            current_val = current_val[last_key_part]
-            return current_val
-        current_val[last_key_part] = value
-        return None
+    def __contains__(self, key: object) -> bool:
+        """True if ``key`` can be retrieved from the layer.
+
+        Like :meth:`__getitem__`, this is strategy-aware, but never raises.
+        """
+        if type(self).__getitem__ is not DictLayer.__getitem__:
+            return super().__contains__(key)
+        if self._split:
+            if not self._mutable:
+                return key in self.__flat()
+            return self.__dot_split_get(key, _MISSING) is not _MISSING
+        return key in self._config_dict
+
+    def __dot_split_get(self, key_str, default: Any) -> Any:
+        """Walks the nested dict for ``key_str``, returning ``default`` on a miss."""
+        keylist, last_key_part = _split_dotted_key(key_str)
+
+        current_val = self._config_dict
+        try:
+            for keypart in keylist:
+                current_val = current_val[keypart]
+            return current_val[last_key_part]
+        except (LookupError, TypeError):
+            return default
 
     def __iter__(self) -> Iterator[str]:
         """Returns an iterator over :meth:`names`"""
@@ -248,78 +361,234 @@ class DictLayer(BaseConfigLayer):
         """Returns the length of the :meth:`names`"""
         return len(self.names)
 
-    def __dot_split_keys(self):
-        def has_subkey(value):
-            return hasattr(value, 'keys')
-
-        def get_subkeys(dct, context=''):
-            keyset = set()
-            for key in dct:
-                full_name = f'{context}.{key}' if context else key
-                val = dct[key]
-                if not has_subkey(val):
-                    keyset.add(full_name)
-                    continue
-                keyset |= get_subkeys(val, full_name)
-            return keyset
-
-        return get_subkeys(self._config_dict)
+    def __flat(self) -> Dict[str, Any]:
+        """Returns the flattened snapshot read by immutable Split layers."""
+        if self._flat_cache is None:
+            self._flat_cache, self._names_cache = self.__dot_split_flatten(snapshot=True)
+        return self._flat_cache
+
+    def __dot_split_flatten(
+            self, snapshot: bool = False
+    ) -> Tuple[Dict[str, Any], FrozenSet[str]]:
+        """Returns a flat view of the nested dict, and the names of its leaves.
+
+        If ``snapshot`` is true, the view maps the dotted name of every leaf
+        and nested dict which splitting the name would reach to its value.
+        Nested dicts are copied and exposed read-only, so the view no longer
+        depends on the underlying dict.  Otherwise the view is left empty.
+        """
+        flat: Dict[str, Any] = {}
+        names = set()
+        # Walk with an explicit stack, so deep configs cost no extra frames.
+        stack: List[Tuple[Optional[str], Mapping, Dict[Any, Any], bool]] = [
+            (None, self._config_dict, {}, True)
+        ]
+        while stack:
+            context, dct, copy, reachable = stack.pop()
+            for key, val in dct.items():
+                # Joined names are interned, so every layer shares one copy.
+                full_name = key if context is None else sys.intern(f'{context}.{key}')
+                # Non-string and dotted keys cannot come from splitting a name.
+                key_reachable = reachable and isinstance(key, str) and '.' not in key
+                # pylint: disable=C0123
+                if type(val) is dict or isinstance(val, Mapping):
+                    nested: Dict[Any, Any] = {}
+                    stack.append((full_name, val, nested, key_reachable))
+                    val = MappingProxyType(nested)
+                else:
+                    names.add(full_name)
+                if snapshot:
+                    copy[key] = val
+                    if key_reachable:
+                        flat[full_name] = val
+        return flat, frozenset(names)
 
     @property
-    def names(self) -> Set[str]:
-        """Returns a strategy-aware set of valid keys"""
-        if self.dot_strategy is DictStructure.Split:
-            return self.__dot_split_keys()
-        if self.dot_strategy is DictStructure.Flat:
-            return set(self._config_dict.keys())
-        raise ValueError('dot_strategy is not a known type')  # pragma: no cover
+    def names(self) -> FrozenSet[str]:
+        """Returns a strategy-aware set of valid keys
+
+        The set is computed once and reused until the layer is modified
+        through :meth:`__setitem__`.  Mutable layers using
+        :attr:`DictStructure.Split` recompute it on every call, since nested
+        dicts returned by the layer may be modified directly.
+        """
+        if self._split and self._mutable:
+            return self.__dot_split_flatten()[1]
+        if self._names_cache is None:
+            if self._split:
+                self._flat_cache, self._names_cache = self.__dot_split_flatten(snapshot=True)
+            else:
+                self._names_cache = frozenset(self._config_dict)
+        return self._names_cache
+
+
+@functools.lru_cache(maxsize=512)
+def _env_var_name(key: str, sep: str, prefix: Optional[str]) -> str:
+    """Converts a dotted config key into an environment variable name."""
+    if prefix:
+        key = f'{prefix}.{key}'
+    return key.replace('.', sep).upper()
 
 
 # pylint: disable=R0901
 class EnvLayer(DictLayer):
     """A :class:`DictLayer` implemetation for reading environment variables."""
+    __slots__ = ('_separator', '_prefix', '_hits')
+
     def __init__(self, name, sep='_', prefix=None):
         super().__init__(name, os.environ, False)
         self._separator = sep
         self._prefix = prefix
         self._hits = set()
 
+    # os.environ is read directly; the DictLayer strategy handling adds nothing
+    # for a flat, immutable layer.
+
     def __getitem__(self, key):
-        newkey = key
-        if self._prefix:
-            newkey = f'{self._prefix}.{key}'
-        transkey = newkey.replace('.', self._separator).upper()
-        rv = super().__getitem__(transkey)
+        envkey = _env_var_name(key, self._separator, self._prefix)
+        try:
+            rv = self._config_dict[envkey]
+        except KeyError:
+            raise NoConfigKey(envkey) from None
         self._hits.add(key)  # only if __getitem__ is successful
         return rv
 
+    def get(self, key, default=None):
+        if type(self).__getitem__ is not EnvLayer.__getitem__:
+            return super().get(key, default)
+        rv = self._config_dict.get(_env_var_name(key, self._separator, self._prefix), _MISSING)
+        if rv is _MISSING:
+            return default
+        self._hits.add(key)
+        return rv
+
+    def __contains__(self, key):
+        if type(self).__getitem__ is not EnvLayer.__getitem__:
+            return super().__contains__(key)
+        return _env_var_name(key, self._separator, self._prefix) in self._config_dict
+
     @property
-    def names(self) -> Set[str]:
-        return self._hits.copy()
+    def names(self) -> FrozenSet[str]:
+        return frozenset(self._hits)
+
+    @property
+    def _indexable(self) -> bool:
+        # names only lists the variables read so far.
+        return False
+
+
+_NOT_INDEXED: Tuple[int, None] = (sys.maxsize, None)
+
+# get() implementations known to return ``default`` for missing keys.
+_SENTINEL_GETS = frozenset((BaseConfigLayer.get, DictLayer.get, EnvLayer.get))
+
+
+def _probe(layer: BaseConfigLayer, key: str, by_get: bool) -> Any:
+    """Returns the value of ``key`` in ``layer``, or ``_MISSING``."""
+    if by_get:
+        return layer.get(key, _MISSING)
+    try:
+        return layer[key]
+    except LookupError:
+        return _MISSING
 
 
 class CLAC:
     """Configuration container/manager.
 
     :meth:`__init__` parameters are the same as :meth:`add_layers`.
+
+    Keys held by immutable, flat :class:`DictLayer` instances are resolved
+    through an index which is rebuilt whenever layers are added, inserted or
+    removed.  All other layers are queried in order, as usual.
     """
+    __slots__ = (
+        '_lookup', '_key_index', '_layers', '_direct_layers', '_index_dirty', '__weakref__'
+    )
+
     def __init__(self, *layers: BaseConfigLayer) -> None:
-        self._lookup: Dict[str, BaseConfigLayer] = dict()
+        self._lookup: Dict[str, BaseConfigLayer] = {}
+        self._key_index: Dict[str, Tuple[int, BaseConfigLayer]] = {}
+        self._layers: Tuple[BaseConfigLayer, ...] = ()
+        self._direct_layers: Tuple[Tuple[int, BaseConfigLayer, bool], ...] = ()
+        self._index_dirty = True
         self.add_layers(*layers)
 
     def __getitem__(self, key: str) -> Any:
         if not key:
             raise ValueError('key param must be non-empty string.')
+        return self._find(key)[1]
 
-        for layer in self._lookup.values():
-            try:
-                rv = layer[key]
+    def _find(self, key: str) -> Tuple[BaseConfigLayer, Any]:
+        """Returns the first layer which holds ``key``, and its value.
+
+        :raises NoConfigKey: ``key`` not in any layer.
+        """
+        if self._index_dirty:
+            self._build_index()
+
+        # Layers which cannot be indexed still have to be asked directly, but
+        # only those ahead of the first indexed layer holding the key.
+        position, indexed = self._key_index.get(key, _NOT_INDEXED)
+        for layer_position, layer, by_get in self._direct_layers:
+            if layer_position > position:
                 break
+            rv = _probe(layer, key, by_get)
+            if rv is not _MISSING:
+                return layer, rv
+
+        if indexed is None:
+            raise NoConfigKey(key)
+        return self._find_indexed(key, position, indexed)
+
+    def _find_indexed(
+            self, key: str, position: int, indexed: BaseConfigLayer
+    ) -> Tuple[BaseConfigLayer, Any]:
+        """Reads ``key`` from the ``indexed`` layer at ``position``.
+
+        If that layer no longer holds the key it was indexed for, every layer
+        after it is queried in order.
+
+        :raises NoConfigKey: ``key`` not in any of those layers.
+        """
+        try:
+            return indexed, indexed[key]
+        except LookupError:
+            pass
+        for layer in self._layers[position + 1:]:
+            try:
+                return layer, layer[key]
             except LookupError:
                 pass
-        else:
-            raise NoConfigKey(key)
-        return rv
+        raise NoConfigKey(key)
+
+    def _build_index(self) -> None:
+        """Rebuilds the key index used by :meth:`__getitem__`.
+
+        Each key from an indexable layer maps to the position and instance
+        of the first such layer which holds it.  All other layers are kept in
+        lookup order, to be queried directly.  Only layers whose ``get`` is
+        known to honour its ``default`` are queried through it.
+        """
+        key_index: Dict[str, Tuple[int, BaseConfigLayer]] = {}
+        direct_layers: List[Tuple[int, BaseConfigLayer, bool]] = []
+        for position, layer in enumerate(self._layers):
+            # pylint: disable=W0212
+            if not layer._indexable:
+                by_get = type(layer).get in _SENTINEL_GETS
+                direct_layers.append((position, layer, by_get))
+                continue
+            for key in layer.names:
+                key_index.setdefault(key, (position, layer))
+
+        self._key_index = key_index
+        self._direct_layers = tuple(direct_layers)
+        self._index_dirty = False
+
+    def _layers_changed(self) -> None:
+        """Refreshes the layer snapshot, and marks the key index as stale."""
+        self._layers = tuple(self._lookup.values())
+        self._index_dirty = True
 
     def get(self,
             key: str,
@@ -356,23 +625,67 @@ class CLAC:
             coercion, and only ``__getitem__`` will support exception
             bubbling.
         """
-        if layer_name and layer_name not in self._lookup:
-            raise MissingLayer(layer_name)
-
-        obj = self._get_layer(layer_name) if layer_name else self
+        obj: Any = self
+        if layer_name:
+            obj = self._lookup.get(layer_name)
+            if obj is None:
+                raise MissingLayer(layer_name)
 
         try:
-            rv = obj[key]  # type: ignore
+            rv = obj[key]
         except LookupError:
             return default
-        if callback:
-            rv = callback(rv)
-        return rv
+        return rv if callback is None else callback(rv)
+
+    def get_many(self, keys: Iterable[str], default: Any = None) -> Dict[str, Any]:
+        """Gets the values for several ``keys`` at once.
+
+        Equivalent to calling :meth:`get` for each key, but walks the layers
+        only once for the whole batch.
+
+        :return: A ``dict`` mapping each key to its value, or to ``default``
+            if no entry was found.
+        """
+        if self._index_dirty:
+            self._build_index()
+
+        values: Dict[str, Any] = {}
+        pending = []
+        for key in keys:
+            if not key:
+                raise ValueError('key param must be non-empty string.')
+            values[key] = default
+            pending.append((key, *self._key_index.get(key, _NOT_INDEXED)))
+
+        for layer_position, layer, by_get in self._direct_layers:
+            if not pending:
+                break
+            remaining = []
+            for entry in pending:
+                key, position, _ = entry
+                if layer_position > position:
+                    remaining.append(entry)  # Resolved by the index below
+                    continue
+                rv = _probe(layer, key, by_get)
+                if rv is _MISSING:
+                    remaining.append(entry)
+                else:
+                    values[key] = rv
+            pending = remaining
+
+        for key, position, indexed in pending:
+            if indexed is None:
+                continue
+            try:
+                values[key] = self._find_indexed(key, position, indexed)[1]
+            except LookupError:
+                pass
+        return values
 
     def __setitem__(self, key: str, value) -> None:
         # Simpler than the getitem implemetation:
         # Find the first mutable layer, and then mutate it.
-        for layer in self._lookup.values():
+        for layer in self._layers:
             if layer.mutable:
                 layer[key] = value
                 return None
@@ -381,19 +694,12 @@ class CLAC:
 
     def setdefault(self, key: str, default: Any = None) -> Any:
         """Call :meth:`BaseConfigLayer.set_default` on the first mutable layer."""
-        for layer in self._lookup.values():
+        for layer in self._layers:
             if layer.mutable:
                 return layer.setdefault(key, default)
 
         raise ImmutableLayer("No mutable layers detected")
 
-    def _get_layer(self, name: str) -> BaseConfigLayer:
-        """Helper function to retrieve layers directly."""
-        try:
-            return self._lookup[name]
-        except KeyError:  # pragma: no cover
-            raise MissingLayer(name) from None
-
     def add_layers(self, *layers: BaseConfigLayer):
         """Adds layers to the lookup set.  Called by :meth:`__init__`
 
@@ -402,6 +708,7 @@ class CLAC:
         """
         for layer in layers:
             self._lookup[layer.name] = layer
+        self._layers_changed()
 
     def insert_layers(self, *layers: BaseConfigLayer, raise_on_replace=True):
         """Inserts layers into the start of the lookup.
@@ -436,6 +743,7 @@ class CLAC:
                 raise LayerOverwriteError(f'Layer would have been overwritten: {old_layer.name}')
 
         self._lookup = new_lookup
+        self._layers_changed()
 
     def remove_layer(self, name: str, error_ok: bool = True):
         """Remove layer ``name`` from the manager.
@@ -448,6 +756,7 @@ class CLAC:
         """
         try:
             del self._lookup[name]
+            self._layers_changed()
         except KeyError:
             if not error_ok:
                 raise MissingLayer(name) from None
@@ -460,29 +769,26 @@ class CLAC:
     @property
     def names(self) -> Set[str]:
         """Returns a set of all unique config keys from all layers."""
-        nameset: Set = set()
-        for layer in self._lookup.values():
-            nameset.update(layer.names)
+        if self._index_dirty:
+            self._build_index()
+
+        # The key index already holds the names of every indexable layer.
+        nameset: Set = set(self._key_index)
+        nameset.update(*(layer.names for _, layer, _ in self._direct_layers))
         return nameset
 
     def resolve(self, key: str) -> Tuple[str, Any]:
         """Returns that name of the layer accessed, and the value retrieved.
 
+        Layers are searched the same way as :meth:`__getitem__`.
+
         :param key: The key to search for.
         :raises NoConfigKey: ``key`` not in any layer.
         :return: 2-tuple: (layer, value)
         """
 
-        # We have to make a failure object so we know that the get() call
-        # did not find the object.
-        _default = object()
-
-        for layer in self._lookup:
-            rv = self.get(key, _default, layer)
-            if rv is _default:
-                continue
-            return layer, rv
-        raise NoConfigKey(key)
+        layer, rv = self._find(key)
+        return layer.name, rv
 
     def build_lri(self) -> Set[Tuple[str, str]]:
         """Returns the Layer Resolution Index (LRI)
@@ -502,15 +808,21 @@ class CLAC:
         The NRI is a ``set`` of 2-tuples which contain the name of the first
         layer that a key can be found in, and the key itself.
         """
-        pairs = [(l.name, set(l.names)) for l in self._lookup.values()]
         name_index: Set[str] = set()
-        nri = set()
-
-        while pairs:
-            layername, layerset = pairs.pop(0)
-            layerset -= name_index
-            nri.update([(layername, key) for key in layerset])
-            name_index |= layerset
+        nri: Set[Tuple[str, str]] = set()
+
+        # Layer sets are read as-is; only keys not yet seen are copied.
+        for layer in self._layers:
+            layerset = layer.names
+            if not isinstance(layerset, (set, frozenset)):
+                layerset = set(layerset)
+            if name_index:
+                layerset = layerset - name_index
+            if not layerset:
+                continue
+            layername = layer.name
+            nri.update((layername, key) for key in layerset)
+            name_index.update(layerset)
         return nri
 
     def build_vri(self) -> Set[Tuple[str, str, Any]]:
@@ -518,17 +830,17 @@ class CLAC:
 
         The VRI is a ``set`` of 2-tuples which contain the name of the first
         layer that a key can be found in, the key itself, and the value that
-        that pair resolves to.
+        that pair resolves to.  Names which their layer lists but cannot
+        resolve, such as dotted keys nested in a :attr:`DictStructure.Split`
+        layer, are left out.
         """
-        nri = self.build_nri()
+        lookup = self._lookup
         vri = set()
-        missing = object()
-
-        for layer, key in nri:
-            value = self.get(key, missing, layer)
-            assert value is not missing  # should never occur
-            vri.add((layer, key, value))
-
+        for layer, key in self.build_nri():
+            try:
+                vri.add((layer, key, lookup[layer][key]))
+            except LookupError:
+                pass
         return vri
 
     @property
@@ -20,18 +20,18 @@
 
 """Batteries-included config layers for the clac library"""
 
-from collections import namedtuple
 import configparser
 import os
-from typing import Union, Any
+import sys
+from typing import Union, Any, Dict, FrozenSet, Optional, Tuple
 
-from clac.core import BaseConfigLayer  # , NoConfigKey
-
-_SplitKey = namedtuple('SplitKey', 'section options')
+from clac.core import BaseConfigLayer, NoConfigKey
 
 
 class IniLayer(BaseConfigLayer):
     """.ini file layer"""
+    __slots__ = ('_parser', '_flat', '_names_cache')
+
     def __init__(
             self,
             name: str,
@@ -40,40 +40,34 @@ class IniLayer(BaseConfigLayer):
         super().__init__(name)
         self._parser = configparser.ConfigParser()
         self._parser.read(files)
+        # The parser is never modified after this, so the keys can be indexed.
+        self._flat: Dict[str, Tuple[str, str]] = {
+            sys.intern(f'{section}.{option}'): (section, option)
+            for section in self._parser
+            for option in self._parser[section]
+        }
+        self._names_cache: Optional[FrozenSet[str]] = None
 
     def __getitem__(self, key: str) -> Any:
-        sect, opt = self._split_key(key)
-        rv = self._parser[sect][opt]
-        return rv
+        try:
+            sect, opt = self._flat[key]
+        except KeyError:
+            # Option names are case-insensitive, so the index may still miss.
+            try:
+                sect, opt = key.split('.', 1)
+                return self._parser[sect][opt]
+            except (ValueError, KeyError):
+                raise NoConfigKey(key) from None
+        return self._parser[sect][opt]
 
     def __iter__(self):
-        def itergen():
-            for section in self._parser:
-                for option in self._parser[section]:
-                    yield self._unify_key(section, option)
-        return itergen()
-
-    @staticmethod
-    def _unify_key(section: str, option: str) -> str:
-        return '.'.join([section, option])
-
-    @staticmethod
-    def _split_key(key: str) -> _SplitKey:
-        split_result = key.split('.', 1)
-        spky = _SplitKey(*split_result)
-        assert len(spky) == 2
-        return spky
+        return iter(self._flat)
 
     def __len__(self):
-        count = 0
-        for section in self._parser:
-            count += len(self._parser[section])
-        return count
+        return len(self._flat)
 
     @property
-    def names(self):
-        nameset = set()
-        for sect in self._parser:
-            for opt in self._parser[sect]:
-                nameset.add(f'{sect}.{opt}')
-        return nameset
+    def names(self) -> FrozenSet[str]:
+        if self._names_cache is None:
+            self._names_cache = frozenset(self._flat)
+        return self._names_cache
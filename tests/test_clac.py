@@ -1,17 +1,49 @@
+import operator
 import pathlib
 # import sys
+from types import MappingProxyType
 from typing import Iterable
 
-from pytest import raises, fixture
+from pytest import raises, fixture, mark
 
 # sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[2]))
 
 from clac import (
-    CLAC, BaseConfigLayer, NoConfigKey, MissingLayer, ImmutableLayer, LayerOverwriteError
+    CLAC, BaseConfigLayer, DictLayer, DictStructure, EnvLayer, NoConfigKey, MissingLayer,
+    ImmutableLayer, LayerOverwriteError
 )
 
 __here__ = pathlib.Path(__file__).resolve().parent
 
+ACCESSORS = mark.parametrize('access', [
+    operator.getitem,
+    lambda cfg, key: cfg.get(key),
+    lambda cfg, key: cfg.get_many([key])[key],
+    lambda cfg, key: cfg.resolve(key)[1],
+], ids=['getitem', 'get', 'get_many', 'resolve'])
+
+EXPECTED_NAMES = frozenset({
+    'test_key',
+    'alpha_secret',
+    'beta_secret',
+    'unique',
+    'gamma_secret',
+})
+EXPECTED_NRI = frozenset({
+    ('alpha', 'test_key'),
+    ('alpha', 'alpha_secret'),
+    ('alpha', 'unique'),
+    ('beta', 'beta_secret'),
+    ('gamma', 'gamma_secret'),
+})
+EXPECTED_VRI = frozenset({
+    ('alpha', 'test_key', 'test_value_alpha'),
+    ('alpha', 'alpha_secret', 'abcde'),
+    ('alpha', 'unique', '0123456789'),
+    ('beta', 'beta_secret', 'fghij'),
+    ('gamma', 'gamma_secret', 'gamma rules!'),
+})
+
 
 class SimpleLayer(BaseConfigLayer):
     def __init__(self, name, data, mutable=False):
@@ -39,50 +71,39 @@ class SimpleLayer(BaseConfigLayer):
         return self.data.keys()
 
 
-@fixture(name='clac_layers')
-def fixture_clac_layers():
-    alpha_dict = {
-        'test_key': 'test_value_alpha',
-        'alpha_secret': 'abcde',
-        'unique': '0123456789'
-    }
-    beta_dict = {
-        'test_key': 'test_value_beta',
-        'beta_secret': 'fghij',
-    }
-    gamma_dict = {
-        'test_key': 'test_value_gamma',
-        'beta_secret': 'klmno',
-        'gamma_secret': 'gamma rules!',
-    }
-    alpha = SimpleLayer('alpha', alpha_dict)
-    beta = SimpleLayer('beta', beta_dict)
-    gamma = SimpleLayer('gamma', gamma_dict)
+ALPHA_DATA = MappingProxyType({
+    'test_key': 'test_value_alpha',
+    'alpha_secret': 'abcde',
+    'unique': '0123456789'
+})
+BETA_DATA = MappingProxyType({
+    'test_key': 'test_value_beta',
+    'beta_secret': 'fghij',
+})
+GAMMA_DATA = MappingProxyType({
+    'test_key': 'test_value_gamma',
+    'beta_secret': 'klmno',
+    'gamma_secret': 'gamma rules!',
+})
 
-    yield alpha, beta, gamma
+
+@fixture(name='clac_layers', scope='module')
+def fixture_clac_layers():
+    # The read-only data guarantees no test can modify the shared layers.
+    yield (
+        SimpleLayer('alpha', ALPHA_DATA),
+        SimpleLayer('beta', BETA_DATA),
+        SimpleLayer('gamma', GAMMA_DATA),
+    )
 
 
 @fixture(name='mutable_layers')
 def fixture_mutable_layers():
-    alpha_dict = {
-        'test_key': 'test_value_alpha',
-        'alpha_secret': 'abcde',
-        'unique': '0123456789'
-    }
-    beta_dict = {
-        'test_key': 'test_value_beta',
-        'beta_secret': 'fghij',
-    }
-    gamma_dict = {
-        'test_key': 'test_value_gamma',
-        'beta_secret': 'klmno',
-        'gamma_secret': 'gamma rules!',
-    }
-    alpha = SimpleLayer('alpha', alpha_dict)
-    beta = SimpleLayer('beta', beta_dict, mutable=True)
-    gamma = SimpleLayer('gamma', gamma_dict)
-
-    yield alpha, beta, gamma
+    yield (
+        SimpleLayer('alpha', ALPHA_DATA),
+        SimpleLayer('beta', dict(BETA_DATA), mutable=True),
+        SimpleLayer('gamma', GAMMA_DATA),
+    )
 
 
 def test_get_from_one_layer(clac_layers):
@@ -105,7 +126,8 @@ def test_get_from_one_layer(clac_layers):
     # assert rs1 is rs2 and rs1 == 'test_value'
 
 
-def test_multi_layer_priority(clac_layers):
+@ACCESSORS
+def test_multi_layer_priority(clac_layers, access):
     alpha, beta, _ = clac_layers
     cfg = CLAC(alpha, beta)
 
@@ -113,9 +135,9 @@ def test_multi_layer_priority(clac_layers):
     assert 'beta' in cfg
     assert 'test_key' in cfg.names
     assert 'beta_secret' in cfg.names
-    assert cfg['test_key'] == 'test_value_alpha'
+    assert access(cfg, 'test_key') == 'test_value_alpha'
     assert cfg.get('test_key', layer_name='beta') == 'test_value_beta'
-    assert cfg['beta_secret'] == 'fghij'
+    assert access(cfg, 'beta_secret') == 'fghij'
 
 
 def test_remove_layer(clac_layers):
@@ -157,11 +179,12 @@ def test_insert_layer(clac_layers):
     }
 
 
-def test_add_layer(clac_layers):
+@ACCESSORS
+def test_add_layer(clac_layers, access):
     alpha, beta, _ = clac_layers
     cfg = CLAC(alpha)
 
-    assert cfg['test_key'] == 'test_value_alpha'
+    assert access(cfg, 'test_key') == 'test_value_alpha'
     with raises(NoConfigKey):
         _ = cfg['beta_secret']
     with raises(MissingLayer):
@@ -169,53 +192,45 @@ def test_add_layer(clac_layers):
 
     cfg.add_layers(beta)
 
-    assert cfg['test_key'] == 'test_value_alpha'
-    assert cfg['beta_secret'] == 'fghij'
+    assert access(cfg, 'test_key') == 'test_value_alpha'
+    assert access(cfg, 'beta_secret') == 'fghij'
     assert cfg.get('test_key', layer_name='beta') == 'test_value_beta'
 
 
 def test_names_property(clac_layers):
     simple_clac = CLAC(*clac_layers)
-    assert {
-        'test_key',
-        'alpha_secret',
-        'beta_secret',
-        'unique',
-        'gamma_secret',
-    } == simple_clac.names
+    assert simple_clac.names == EXPECTED_NAMES
 
 
 def test_build_lri(clac_layers):
     simple_clac = CLAC(*clac_layers)
-    assert simple_clac.build_lri() == {
-        ('alpha', 'test_key'),
-        ('alpha', 'alpha_secret'),
-        ('alpha', 'unique'),
-        ('beta', 'beta_secret'),
-        ('gamma', 'gamma_secret'),
-    }
+    assert simple_clac.build_lri() == EXPECTED_NRI
 
 
 def test_build_nri(clac_layers):
     simple_clac = CLAC(*clac_layers)
-    assert simple_clac.build_nri() == {
-        ('alpha', 'test_key'),
-        ('alpha', 'alpha_secret'),
-        ('alpha', 'unique'),
-        ('beta', 'beta_secret'),
-        ('gamma', 'gamma_secret'),
-    }
+    assert simple_clac.build_nri() == EXPECTED_NRI
+
+
+def test_build_nri_single_use_names():
+    class GeneratorLayer(SimpleLayer):
+        @property
+        def names(self):
+            return (key for key in self.data)
+
+    cfg = CLAC(GeneratorLayer('a', {'k': 1}), GeneratorLayer('b', {'k': 2}))
+    assert cfg.build_nri() == {('a', 'k')}
 
 
 def test_build_vri(clac_layers):
     simple_clac = CLAC(*clac_layers)
-    assert simple_clac.build_vri() == {
-        ('alpha', 'test_key', 'test_value_alpha'),
-        ('alpha', 'alpha_secret', 'abcde'),
-        ('alpha', 'unique', '0123456789'),
-        ('beta', 'beta_secret', 'fghij'),
-        ('gamma', 'gamma_secret', 'gamma rules!'),
-    }
+    assert simple_clac.build_vri() == EXPECTED_VRI
+
+
+def test_build_vri_unreachable_name():
+    cfg = CLAC(DictLayer('s', {'a.b': 1, 'c': {'d': 2}}, dot_strategy=DictStructure.Split))
+    assert cfg.build_nri() == {('s', 'a.b'), ('s', 'c.d')}
+    assert cfg.build_vri() == {('s', 'c.d', 2)}
 
 
 def test_get_default(clac_layers):
@@ -308,3 +323,154 @@ def test_layers(clac_layers):
     simple_clac = CLAC(*clac_layers)
     expected_lookup = {layer.name: layer for layer in clac_layers}
     assert simple_clac.layers == expected_lookup
+
+
+def test_indexed_layer_priority(clac_layers):
+    alpha, beta, _ = clac_layers
+    indexed = DictLayer('indexed', {'test_key': 'indexed_value', 'indexed_only': 1})
+    cfg = CLAC(alpha, indexed, beta)
+
+    assert cfg['test_key'] == 'test_value_alpha'
+    assert cfg['indexed_only'] == 1
+    assert cfg['beta_secret'] == 'fghij'
+    with raises(NoConfigKey):
+        _ = cfg['missing']
+
+    cfg.remove_layer('alpha')
+    assert cfg['test_key'] == 'indexed_value'
+    cfg.insert_layers(beta)
+    assert cfg['test_key'] == 'test_value_beta'
+    cfg.remove_layer('beta')
+    cfg.add_layers(DictLayer('other', {'test_key': 'other_value', 'other_only': 2}))
+    assert cfg['test_key'] == 'indexed_value'
+    assert cfg['other_only'] == 2
+    assert cfg.names == {'test_key', 'indexed_only', 'other_only'}
+
+
+def test_indexed_layer_key_removed():
+    data = {'a': 1}
+    cfg = CLAC(DictLayer('l1', data), DictLayer('l2', {'a': 2, 'b': 3}))
+    assert cfg['a'] == 1
+
+    del data['a']
+    assert cfg['a'] == 2
+    assert cfg.get('a') == 2
+
+
+def test_indexed_layer_falls_through():
+    class ShrinkingLayer(DictLayer):
+        def pop(self, key):
+            del self._config_dict[key]
+
+    shrinking = ShrinkingLayer('l1', {'a': 1})
+    cfg = CLAC(shrinking, DictLayer('l2', {'a': 2}))
+    assert cfg['a'] == 1
+
+    shrinking.pop('a')
+    assert cfg['a'] == 2
+    assert cfg.resolve('a') == ('l2', 2)
+    assert cfg.get_many(['a']) == {'a': 2}
+    cfg.remove_layer('l2')
+    assert cfg.get('a') is None
+    assert cfg.get_many(['a'], 0) == {'a': 0}
+
+
+def test_custom_lookup_not_indexed():
+    class Alias(DictLayer):
+        def __getitem__(self, key):
+            return super().__getitem__(key.lower())
+
+    layer = Alias('alias', {'key': 1})
+    assert layer['KEY'] == 1
+    assert layer.get('KEY') == 1
+    assert 'KEY' in layer
+    assert CLAC(layer)['KEY'] == 1
+    assert CLAC(layer).get_many(['KEY']) == {'KEY': 1}
+
+
+def test_custom_env_lookup(monkeypatch):
+    class Override(EnvLayer):
+        def __getitem__(self, key):
+            if key == 'missing':
+                raise NoConfigKey(key)
+            return 'OVERRIDE'
+
+    monkeypatch.setenv('FOO', 'bar')
+    layer = Override('env')
+    assert layer['foo'] == 'OVERRIDE'
+    assert layer.get('foo') == 'OVERRIDE'
+    assert 'missing' not in layer
+    cfg = CLAC(layer)
+    assert cfg['foo'] == 'OVERRIDE'
+    assert cfg.get('foo') == 'OVERRIDE'
+    assert cfg.get_many(['foo', 'missing']) == {'foo': 'OVERRIDE', 'missing': None}
+
+
+def test_get_ignoring_default():
+    class LooseLayer(SimpleLayer):
+        def get(self, key, default=None):
+            return self.data.get(key)
+
+    cfg = CLAC(LooseLayer('x', {}), DictLayer('y', {'k': 1}, mutable=True))
+    assert cfg['k'] == 1
+    assert cfg.get_many(['k']) == {'k': 1}
+
+
+def test_indexed_layer_not_probed():
+    class CountingLayer(DictLayer):
+        probes = 0
+
+        def get(self, key, default=None):
+            CountingLayer.probes += 1
+            return super().get(key, default)
+
+        def __contains__(self, key):
+            CountingLayer.probes += 1
+            return super().__contains__(key)
+
+    cfg = CLAC(*[CountingLayer(str(i), {f'key{i}': i}) for i in range(10)])
+
+    assert cfg['key9'] == 9
+    assert cfg.get('missing') is None
+    assert CountingLayer.probes == 0
+
+
+def test_layer_contains_no_config_key():
+    class StrictLayer(SimpleLayer):
+        __contains__ = BaseConfigLayer.__contains__
+
+        def __getitem__(self, key):
+            try:
+                return self.data[key]
+            except KeyError:
+                raise NoConfigKey(key) from None
+
+    layer = StrictLayer('strict', {'key': 'value'})
+    assert 'key' in layer
+    assert 'missing' not in layer
+
+
+def test_get_many(clac_layers):
+    alpha, beta, gamma = clac_layers
+    cfg = CLAC(alpha, DictLayer('indexed', {'test_key': 1, 'beta_secret': 2}), beta, gamma)
+    default = object()
+
+    assert cfg.get_many(['test_key', 'beta_secret', 'gamma_secret', 'missing'], default) == {
+        'test_key': 'test_value_alpha',
+        'beta_secret': 2,
+        'gamma_secret': 'gamma rules!',
+        'missing': default,
+    }
+    assert cfg.get_many([]) == {}
+    with raises(ValueError):
+        cfg.get_many(['test_key', ''])
+
+
+def test_resolve_indexed(clac_layers):
+    alpha, beta, _ = clac_layers
+    cfg = CLAC(alpha, DictLayer('indexed', {'test_key': 1, 'beta_secret': 2}), beta)
+
+    assert cfg.resolve('test_key') == ('alpha', 'test_value_alpha')
+    assert cfg.resolve('beta_secret') == ('indexed', 2)
+    with raises(NoConfigKey):
+        cfg.resolve('missing.key')
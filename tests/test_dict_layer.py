@@ -1,9 +1,9 @@
-from pytest import fixture, raises
+from pytest import fixture, mark, raises
 
 from clac import DictLayer, DictStructure, NoConfigKey
 
 
-@fixture(name='flat_layer')
+@fixture(name='flat_layer', scope='module')
 def fixture_flat_dict_layer():
     yield DictLayer(
         'test-dict',
@@ -14,7 +14,7 @@ def fixture_flat_dict_layer():
     )
 
 
-@fixture(name='dotted_layer')
+@fixture(name='dotted_layer', scope='module')
 def fixture_dotted_dict_layer():
     yield DictLayer(
         'test-dict',
@@ -93,6 +93,9 @@ def test_flat_getitem_dictlayer(flat_layer):
 def test_dotted_getitem_dictlayer(dotted_layer):
     assert dotted_layer['key1'] == 123
     assert dotted_layer['flat.dot.key'] == 'abc'
+    assert dotted_layer['flat.dot'] == {'key': 'abc'}
+    with raises(LookupError):
+        _ = dotted_layer['flat.dot.missing']
 
 
 def test_dotted_len_dictlayer(dotted_layer):
@@ -111,3 +114,93 @@ def test_dotted_names_dictlayer(dotted_layer):
         "key1",
         "flat.dot.key"
     } == dotted_layer.names
+
+
+def test_names_cache_invalidation():
+    layer = DictLayer('name', {'key1': 123}, mutable=True)
+
+    assert layer.names is layer.names
+    assert layer.names == {'key1'}
+    layer['key2'] = 456
+    assert layer.names == {'key1', 'key2'}
+
+
+def test_split_names_cache_invalidation():
+    layer = DictLayer('name', {'a': {'b': 1}}, mutable=True, dot_strategy=DictStructure.Split)
+
+    assert layer.names == {'a.b'}
+    layer['a.c'] = 2
+    assert layer.names == {'a.b', 'a.c'}
+    assert layer['a.c'] == 2
+
+
+def test_split_mutable_get():
+    layer = DictLayer('name', {'a': {'b': 1}}, mutable=True, dot_strategy=DictStructure.Split)
+
+    assert layer.get('a.b') == 1
+    assert layer.get('a') == {'b': 1}
+    assert layer.get('a.b.c') is None
+    assert layer.get('x.y', 0) == 0
+    layer['a']['c'] = 2
+    assert layer.get('a.c') == 2
+
+
+def test_split_names_nested_mutation():
+    layer = DictLayer('name', {'a': {'b': 1}}, mutable=True, dot_strategy=DictStructure.Split)
+
+    assert layer.names == {'a.b'}
+    layer['a']['c'] = 2
+    assert layer.names == {'a.b', 'a.c'}
+    assert len(layer) == 2
+
+
+@mark.parametrize('mutable', [False, True])
+def test_split_dotted_key_not_reachable(mutable):
+    layer = DictLayer(
+        'name', {'a.b': 1, 'c': {'d': 2}}, mutable=mutable, dot_strategy=DictStructure.Split
+    )
+
+    with raises(LookupError):
+        _ = layer['a.b']
+    assert layer.get('a.b') is None
+    assert 'a.b' not in layer
+    assert layer['c.d'] == 2
+    assert layer.names == {'a.b', 'c.d'}
+
+
+def test_split_snapshot_consistent():
+    data = {'a': {'b': 1}}
+    layer = DictLayer('name', data, dot_strategy=DictStructure.Split)
+    assert layer['a.b'] == 1
+
+    data['a']['b'] = 2
+    data['a']['c'] = 3
+    assert layer['a.b'] == 1
+    assert layer.get('a.c') is None
+    assert 'a.c' not in layer
+    assert layer['a'] == {'b': 1}
+    with raises(TypeError):
+        layer['a']['c'] = 3
+    assert layer.names == {'a.b'}
+
+
+def test_flat_contains_dictlayer(flat_layer):
+    assert 'flat.dot.key' in flat_layer
+    assert 'flat.dot' not in flat_layer
+
+
+def test_dotted_contains_dictlayer(dotted_layer):
+    assert 'flat.dot.key' in dotted_layer
+    assert 'flat.dot' in dotted_layer
+    assert 'flat.dot.missing' not in dotted_layer
+    assert 'key1.subkey' not in dotted_layer
+    assert 'flat.dot.key.a' not in dotted_layer
+
+
+def test_get_dictlayer(flat_layer, dotted_layer):
+    default = object()
+    assert flat_layer.get('key1') == 123
+    assert flat_layer.get('flat.dot', default) is default
+    assert dotted_layer.get('flat.dot.key') == 'abc'
+    assert dotted_layer.get('flat.dot') == {'key': 'abc'}
+    assert dotted_layer.get('flat.dot.missing', default) is default
@@ -1,31 +1,32 @@
-import os
+from pytest import mark
 
 from clac import EnvLayer
+from clac.core import _env_var_name
 
 
-def test_env_get():
-    layer = EnvLayer('env')
+@mark.parametrize('prefix, envvar', [
+    (None, 'SOME_SECRET_KEY'),
+    ('myprefix', 'MYPREFIX_SOME_SECRET_KEY'),
+])
+def test_env_get(monkeypatch, prefix, envvar):
+    layer = EnvLayer('env', prefix=prefix)
 
-    os.environ['SOME_SECRET_KEY'] = '1234567890'
+    monkeypatch.setenv(envvar, '1234567890')
     assert layer['some.secret.Key'] == '1234567890'
+    hits = _env_var_name.cache_info().hits
+    assert layer['some.secret.Key'] == '1234567890'
+    assert _env_var_name.cache_info().hits == hits + 1
+    assert 'some.secret.key' in layer
+    assert 'this.does.not.exist' not in layer
     assert layer.get('some.secret.key') == '1234567890'
     assert layer.get('this.does.not.exist') is None
 
 
-def test_env_prefix():
-    layer = EnvLayer('env', prefix='myprefix')
-
-    os.environ['MYPREFIX_SOME_SECRET_KEY'] = '9876543210'
-    assert layer['some.secret.Key'] == '9876543210'
-    assert layer.get('some.secret.key') == '9876543210'
-    assert layer.get('this.does.not.exist') is None
-
-
-def test_env_names():
+def test_env_names(monkeypatch):
     layer = EnvLayer('env', prefix='myprefix')
 
-    os.environ['MYPREFIX_SOME_SECRET_KEY'] = '9876543210'
-    os.environ['MYPREFIX_SOME_PUBLIC_KEY'] = 'abcd'
+    monkeypatch.setenv('MYPREFIX_SOME_SECRET_KEY', '9876543210')
+    monkeypatch.setenv('MYPREFIX_SOME_PUBLIC_KEY', 'abcd')
     assert layer['some.secret.key'] == '9876543210'
     assert layer.get('some.secret.key') == '9876543210'
     assert layer.get('this.does.not.exist') is None
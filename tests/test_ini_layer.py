@@ -34,3 +34,13 @@ def test_inilayer_names(testlayer):
         'section.option',
         'section.subsect.subopt'
     } == testlayer.names
+
+
+def test_inilayer_case_insensitive_option(testlayer):
+    assert testlayer['section.OPTION'] == 'value'
+
+
+def test_inilayer_missing_key(testlayer):
+    assert 'nodots' not in testlayer
+    assert 'section.missing' not in testlayer
+    assert testlayer.get('missing.option') is None